@@ -17,18 +17,20 @@ from tkinter import filedialog, messagebox
 import sys
 import re
 from shutil import copyfile
-
-def show_debug_image(title, image):
-    """
-    Display the image in a window for debugging purposes.
-    """
-    cv2.imshow(title, image)
-    cv2.waitKey(0)
-    cv2.destroyAllWindows()
+from concurrent.futures import ThreadPoolExecutor
 
 # Debugging mode to save intermediate images and logs
 DEBUG_MODE = True
 
+# One background thread writes the debug images in order; pending writes finish before exit
+debug_image_writer = ThreadPoolExecutor(max_workers=1)
+
+def save_debug_image(filename, image):
+    """
+    Save an intermediate image for debugging on the background writer thread.
+    """
+    debug_image_writer.submit(cv2.imwrite, filename, image)
+
 # Set the path to the Tesseract executable (update as per your system configuration)
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
@@ -46,8 +48,7 @@ def preprocess_image(image):
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
     if DEBUG_MODE:
-        cv2.imwrite("preprocessed_image_debug.png", thresh)
-        show_debug_image("Preprocessed Image", thresh)
+        save_debug_image("preprocessed_image_debug.png", thresh)
     return thresh
 
 def dynamic_crop_box_qty_area(image):
@@ -58,32 +59,34 @@ def dynamic_crop_box_qty_area(image):
     try:
         # Use Tesseract to detect all text positions
         ocr_data = pytesseract.image_to_data(image, config='--psm 6', output_type=pytesseract.Output.DICT)
-        print("OCR Data for BOX QTY Detection:")
-        for i, text in enumerate(ocr_data['text']):
-            print(f"Text: {text}, Position: x={ocr_data['left'][i]}, y={ocr_data['top'][i]}, w={ocr_data['width'][i]}, h={ocr_data['height'][i]}")
+        if DEBUG_MODE:
+            print("OCR Data for BOX QTY Detection:")
+            for i, text in enumerate(ocr_data['text']):
+                print(f"Text: {text}, Position: x={ocr_data['left'][i]}, y={ocr_data['top'][i]}, w={ocr_data['width'][i]}, h={ocr_data['height'][i]}")
         
         for i, text in enumerate(ocr_data['text']):
             if text and "BOX QTY" in text.upper():
                 x, y, w, h = ocr_data['left'][i], ocr_data['top'][i], ocr_data['width'][i], ocr_data['height'][i]
-                print(f"BOX QTY found at: x={x}, y={y}, w={w}, h={h}")
+                if DEBUG_MODE:
+                    print(f"BOX QTY found at: x={x}, y={y}, w={w}, h={h}")
                 # Refine crop area specifically below 'BOX QTY'
                 cropped_image = image[y + h + 5:y + h + 50, x:x + w]
                 if DEBUG_MODE:
-                    cv2.imwrite("cropped_box_qty_debug.png", cropped_image)  # Save for debugging
-                    show_debug_image("Cropped BOX QTY", cropped_image)
+                    save_debug_image("cropped_box_qty_debug.png", cropped_image)
                 return cropped_image
     except Exception as e:
-        print(f"Dynamic crop failed: {e}")
-    
-    print("Falling back to static crop for BOX QTY.")
+        if DEBUG_MODE:
+            print(f"Dynamic crop failed: {e}")
+
+    if DEBUG_MODE:
+        print("Falling back to static crop for BOX QTY.")
     height, width = image.shape[:2]
     cropped_static = image[
         int(BOX_QTY_FALLBACK_TOP * height):int(BOX_QTY_FALLBACK_BOTTOM * height),
         int(BOX_QTY_FALLBACK_LEFT * width):int(BOX_QTY_FALLBACK_RIGHT * width)
     ]
     if DEBUG_MODE:
-        cv2.imwrite("static_cropped_box_qty_debug.png", cropped_static)  # Save fallback for debugging
-        show_debug_image("Static Cropped BOX QTY", cropped_static)
+        save_debug_image("static_cropped_box_qty_debug.png", cropped_static)
     return cropped_static
 
 def preprocess_for_box_qty(cropped_image):
@@ -96,11 +99,11 @@ def preprocess_for_box_qty(cropped_image):
         resized = cv2.resize(gray, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
         _, thresh = cv2.threshold(resized, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
         if DEBUG_MODE:
-            cv2.imwrite("preprocessed_box_qty_debug.png", thresh)  # Save for debugging
-            show_debug_image("Preprocessed BOX QTY", thresh)
+            save_debug_image("preprocessed_box_qty_debug.png", thresh)
         return thresh
     except Exception as e:
-        print(f"Error preprocessing BOX QTY: {e}")
+        if DEBUG_MODE:
+            print(f"Error preprocessing BOX QTY: {e}")
         return cropped_image
 
 def enhanced_preprocessing(image):
@@ -123,9 +126,10 @@ def extract_box_qty_from_text(text):
     Extracts the numeric value for 'Box QTY' using refined regex.
     Captures all numbers and returns the first valid numeric value.
     """
-    print(f"OCR Output for BOX QTY: '{text}'")
     numbers = re.findall(r'\b\d+\b', text.strip())  # Match all valid numbers
-    print(f"Numbers found: {numbers}")  # Debugging: Log all numbers found
+    if DEBUG_MODE:
+        print(f"OCR Output for BOX QTY: '{text}'")
+        print(f"Numbers found: {numbers}")  # Debugging: Log all numbers found
     return numbers[0] if numbers else "N/A"  # Return the first valid number
 
 def extract_qr_and_box_qty(image):
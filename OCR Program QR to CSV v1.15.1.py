@@ -2,14 +2,22 @@
 # This script uses Tesseract OCR, an open-source optical character recognition engine,
 # to extract QR code data and numeric text below 'Box QTY' from images and PDF files,
 # formats it, and exports it to a CSV file. A graphical user interface (GUI) allows for
-# file selection and output location. Ensure Tesseract, pdf2image, and pyzbar libraries are installed.
+# file selection and output location. Ensure Tesseract, PyMuPDF, and zxing-cpp (or pyzbar) libraries are installed.
 
 import pytesseract
+try:
+    import tesserocr
+except ImportError:  # Fall back to spawning the Tesseract executable through pytesseract
+    tesserocr = None
 from PIL import Image
-from pdf2image import convert_from_path
+import pymupdf
 import cv2
 import numpy as np
-from pyzbar.pyzbar import decode
+try:
+    import zxingcpp
+except ImportError:  # Fall back to pyzbar when zxing-cpp is not installed
+    zxingcpp = None
+    from pyzbar.pyzbar import decode
 import os
 import csv
 import tkinter as tk
@@ -18,13 +26,22 @@ import sys
 import re
 from shutil import copyfile
 import subprocess
-import platform
+import multiprocessing
+import tempfile
+import threading
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Debugging mode toggle
 DEBUG_MODE = False
 
+# How often (ms) the GUI picks up progress and results from the extraction thread
+GUI_POLL_MS = 100
+
 # Set the path to the Tesseract executable (update as per your system configuration)
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Language data used by tesserocr (the default location is used when this folder does not exist)
+TESSDATA_PATH = r'C:\Program Files\Tesseract-OCR\tessdata'
 
 # Fallback crop configuration percentages
 BOX_QTY_FALLBACK_TOP = 0.87
@@ -32,50 +49,238 @@ BOX_QTY_FALLBACK_BOTTOM = 0.92
 BOX_QTY_FALLBACK_LEFT = 0.73
 BOX_QTY_FALLBACK_RIGHT = 0.87
 
-def install_poppler():
+# Number of worker processes used for PDF pages. The workers only render pages, decode QR codes
+# and match templates (single-threaded work), so one worker per core keeps the machine busy.
+PDF_WORKERS = os.cpu_count() or 1
+# Number of batched Tesseract runs started concurrently. Tesseract already runs ~4 threads
+# per call, so one run per 4 cores keeps the machine busy without oversubscribing.
+TESSERACT_JOBS = max(1, (os.cpu_count() or 1) // 4)
+# Number of worker threads used instead when tesserocr is available. tesserocr, zxing-cpp and
+# OpenCV release the GIL, so threads avoid process start-up and pickling page results.
+PDF_THREADS = os.cpu_count() or 1
+
+# Tesseract configurations for locating the 'BOX QTY' label and reading its digits
+BOX_QTY_LOCATE_CONFIG = '--psm 6'
+BOX_QTY_DIGITS_CONFIG = '--psm 7 -c tessedit_char_whitelist=0123456789'
+
+# Pages per batched Tesseract run; the CSV rows of each batch are written as soon as it is done
+OCR_BATCH_PAGES = 50
+
+# First run of digits in the Tesseract output for the BOX QTY crop
+BOX_QTY_NUMBER_PATTERN = re.compile(r'\b\d+\b')
+
+# zxing-cpp reader options shared by every worker. QR codes are found in any orientation
+# and are printed dark on light, so the extra rotated and inverted passes are skipped.
+QR_READER_OPTIONS = {
+    'formats': zxingcpp.BarcodeFormat.QRCode,
+    'try_rotate': False,
+    'try_invert': False,
+} if zxingcpp is not None else None
+
+# QR fields are separated by both ':' and '|'; ':' is mapped to '|' so one split handles both
+QR_SEPARATOR_TABLE = str.maketrans(':', '|')
+
+# Resolution used when rendering PDF pages. QR codes decode fine at 150 DPI, so only the
+# BOX QTY area (or a page whose label must be found by Tesseract) is rendered at 300 DPI.
+# Without box_qty_template.png every page is rendered once at 300 DPI instead.
+PDF_RENDER_DPI = 150
+BOX_QTY_RENDER_DPI = 300
+
+# Folder holding the optional template images
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Pre-rendered 'BOX QTY' label (grayscale, at PDF_RENDER_DPI) used to find the label
+# without a full-page Tesseract run. Tesseract is used when the file is missing or no match is found.
+BOX_QTY_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, "box_qty_template.png")
+BOX_QTY_TEMPLATE = (cv2.imread(BOX_QTY_TEMPLATE_PATH, cv2.IMREAD_GRAYSCALE)
+                    if os.path.exists(BOX_QTY_TEMPLATE_PATH) else None)
+BOX_QTY_TEMPLATE_THRESHOLD = 0.7
+
+# Digit images digits/0.png ... digits/9.png cut from a correctly read BOX QTY, used to read
+# the digits by template matching. Tesseract is used when a digit is missing or a blob does not match.
+DIGIT_TEMPLATE_DIR = os.path.join(TEMPLATE_DIR, "digits")
+DIGIT_SIZE = (28, 28)
+DIGIT_MATCH_THRESHOLD = 0.6
+# Blobs shorter than this fraction of the tallest blob are treated as noise
+DIGIT_MIN_HEIGHT_RATIO = 0.5
+
+# Progress and completion messages posted by the extraction thread for the Tk main loop
+gui_queue = queue.Queue()
+
+# PDF document opened once per worker process by init_pdf_worker, or shared by the worker threads.
+# PyMuPDF is not thread-safe, so every call into it holds _render_lock.
+_worker_document = None
+_render_lock = threading.Lock()
+
+# In-process tesserocr APIs (label locator, digit reader) kept alive per thread by get_tesseract_apis
+_tesseract_local = threading.local()
+
+def normalize_digit(digit_mask):
     """
-    Automatically install Poppler if not found.
+    Crops a white-on-black digit mask to its bounding box, pads it to a square so the
+    aspect ratio is kept, and scales it to DIGIT_SIZE.
     """
-    if platform.system() == "Windows":
-        poppler_url = "https://dl.xpdfreader.com/poppler-23.05.0-x64.zip"
-        messagebox.showinfo("Poppler Required", "Poppler is required to process PDFs. Downloading and installing...")
-        try:
-            import requests, zipfile, io
-            r = requests.get(poppler_url)
-            z = zipfile.ZipFile(io.BytesIO(r.content))
-            z.extractall("poppler")
-            os.environ["PATH"] += os.pathsep + os.path.abspath("poppler/poppler-23.05.0-x64/bin")
-            messagebox.showinfo("Success", "Poppler installed successfully.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to install Poppler: {e}")
-    else:
-        messagebox.showerror("Unsupported OS", "Automatic Poppler installation is only supported on Windows.")
+    points = cv2.findNonZero(digit_mask)
+    if points is None:
+        return None
+    x, y, w, h = cv2.boundingRect(points)
+    side = max(w, h)
+    pad_x, pad_y = (side - w) // 2, (side - h) // 2
+    square = cv2.copyMakeBorder(digit_mask[y:y + h, x:x + w], pad_y, side - h - pad_y, pad_x, side - w - pad_x,
+                                cv2.BORDER_CONSTANT, value=0)
+    return cv2.resize(square, DIGIT_SIZE, interpolation=cv2.INTER_AREA)
 
-try:
-    convert_from_path  # Check if Poppler is available
-except Exception:
-    install_poppler()
+def load_digit_templates():
+    """
+    Loads digits/0.png ... digits/9.png (dark digits on a light background) as normalized masks.
+    Returns None unless all ten digits are available.
+    """
+    templates = []
+    for digit in range(10):
+        path = os.path.join(DIGIT_TEMPLATE_DIR, f"{digit}.png")
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE) if os.path.exists(path) else None
+        if image is None:
+            return None
+        _, mask = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        template = normalize_digit(mask)
+        if template is None:
+            return None
+        templates.append(template)
+    return templates
+
+DIGIT_TEMPLATES = load_digit_templates()
+
+def to_grayscale(image):
+    """
+    Converts a BGR image to grayscale, passing grayscale images through unchanged.
+    """
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
 def preprocess_image(image):
     """
     Preprocess the image to improve OCR and QR code detection.
-    Converts to grayscale and applies thresholding.
+    Converts to grayscale (unless already grayscale) and applies thresholding.
     """
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    gray = to_grayscale(image)
     _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
     return thresh
 
-def dynamic_crop_box_qty_area(image):
+def decode_qr_codes(image):
+    """
+    Decodes the QR codes in the image with zxing-cpp, or pyzbar when zxing-cpp is not installed.
+    """
+    if zxingcpp is not None:
+        return [result.text for result in zxingcpp.read_barcodes(image, **QR_READER_OPTIONS)]
+    return [qr.data.decode('utf-8') for qr in decode(image)]
+
+def locate_box_qty_label(gray):
+    """
+    Finds the 'BOX QTY' label by template matching on the thresholded grayscale page.
+    Returns (x, y, w, h) of the label, or None when no template or no confident match.
+    """
+    if BOX_QTY_TEMPLATE is None:
+        return None
+    template_height, template_width = BOX_QTY_TEMPLATE.shape[:2]
+    height, width = gray.shape[:2]
+    if template_height > height or template_width > width:
+        return None
+    result = cv2.matchTemplate(preprocess_image(gray), BOX_QTY_TEMPLATE, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    if max_val < BOX_QTY_TEMPLATE_THRESHOLD:
+        return None
+    return max_loc[0], max_loc[1], template_width, template_height
+
+def get_tesseract_apis():
+    """
+    Returns the persistent tesserocr APIs of the calling thread as (locate_api, digits_api),
+    creating them on first use so the Tesseract models are only loaded once per thread.
+    """
+    apis = getattr(_tesseract_local, 'apis', None)
+    if apis is None:
+        options = {'path': TESSDATA_PATH} if os.path.isdir(TESSDATA_PATH) else {}
+        locate_api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_BLOCK, **options)
+        digits_api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_LINE, **options)
+        digits_api.SetVariable('tessedit_char_whitelist', '0123456789')
+        apis = _tesseract_local.apis = locate_api, digits_api
+    return apis
+
+def ocr_box_qty_label_data(image):
+    """
+    Runs Tesseract over a page to locate words and returns them in image_to_data dict form.
+    Uses the in-process tesserocr API when available.
+    """
+    if tesserocr is None:
+        return pytesseract.image_to_data(image, config=BOX_QTY_LOCATE_CONFIG, output_type=pytesseract.Output.DICT)
+
+    ocr_data = {'text': [], 'left': [], 'top': [], 'width': [], 'height': []}
+    locate_api, _ = get_tesseract_apis()
+    locate_api.SetImage(Image.fromarray(image))
+    locate_api.Recognize()
+    iterator = locate_api.GetIterator()
+    if iterator is None:
+        return ocr_data
+    level = tesserocr.RIL.WORD
+    for word in tesserocr.iterate_level(iterator, level):
+        box = word.BoundingBox(level)
+        if box is None:
+            continue
+        x1, y1, x2, y2 = box
+        ocr_data['text'].append(word.GetUTF8Text(level))
+        ocr_data['left'].append(x1)
+        ocr_data['top'].append(y1)
+        ocr_data['width'].append(x2 - x1)
+        ocr_data['height'].append(y2 - y1)
+    return ocr_data
+
+def ocr_box_qty_digits(processed_box_qty_image):
+    """
+    Reads the digits of a preprocessed BOX QTY crop with Tesseract.
+    Uses the in-process tesserocr API when available.
+    """
+    if tesserocr is None:
+        return pytesseract.image_to_string(processed_box_qty_image, config=BOX_QTY_DIGITS_CONFIG)
+    if processed_box_qty_image.size == 0:
+        return ""
+    _, digits_api = get_tesseract_apis()
+    digits_api.SetImage(Image.fromarray(processed_box_qty_image))
+    return digits_api.GetUTF8Text()
+
+def find_box_qty_label_in_ocr_data(ocr_data):
+    """
+    Finds the 'BOX QTY' label in image_to_data output.
+    Returns (x, y, w, h) of the label, or None when it was not recognized.
+    """
+    texts = np.char.upper(np.array(ocr_data['text'], dtype=str))
+    matches = np.flatnonzero(np.char.find(texts, "BOX QTY") >= 0)
+    if not matches.size:
+        return None
+    i = int(matches[0])
+    return ocr_data['left'][i], ocr_data['top'][i], ocr_data['width'][i], ocr_data['height'][i]
+
+def box_qty_crop_rect(label_box):
+    """
+    Returns the (left, top, right, bottom) pixel area below the 'BOX QTY' label.
+    """
+    x, y, w, h = label_box
+    return x, y + h + 5, x + w + 20, y + h + 70
+
+def dynamic_crop_box_qty_area(image, ocr_data=None, label_box=None):
     """
     Dynamically finds 'BOX QTY' and crops a refined area below it.
+    Uses label_box when the label was already located, otherwise falls back to Tesseract,
+    reusing ocr_data when the page was already run through image_to_data.
     """
     try:
-        ocr_data = pytesseract.image_to_data(image, config='--psm 6', output_type=pytesseract.Output.DICT)
-        for i, text in enumerate(ocr_data['text']):
-            if text and "BOX QTY" in text.upper():
-                x, y, w, h = ocr_data['left'][i], ocr_data['top'][i], ocr_data['width'][i], ocr_data['height'][i]
-                cropped_image = image[y + h + 5:y + h + 70, x:x + w + 20]
-                return cropped_image
+        if label_box is None:
+            if ocr_data is None:
+                ocr_data = ocr_box_qty_label_data(image)
+            label_box = find_box_qty_label_in_ocr_data(ocr_data)
+        if label_box is not None:
+            left, top, right, bottom = box_qty_crop_rect(label_box)
+            cropped_image = image[top:bottom, left:right]
+            return cropped_image
     except Exception as e:
         pass
 
@@ -89,66 +294,299 @@ def dynamic_crop_box_qty_area(image):
 def preprocess_for_box_qty(cropped_image):
     """
     Preprocess the cropped BOX QTY area for OCR using adaptive thresholding.
+    Thresholds at the original size, then upsamples the binary image 3x with nearest-neighbour.
     """
     try:
-        gray = cv2.cvtColor(cropped_image, cv2.COLOR_BGR2GRAY)
-        resized = cv2.resize(gray, None, fx=3, fy=3, interpolation=cv2.INTER_LINEAR)
-        blurred = cv2.GaussianBlur(resized, (5, 5), 0)
-        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
-        return thresh
+        gray = to_grayscale(cropped_image)
+        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        return cv2.resize(thresh, None, fx=3, fy=3, interpolation=cv2.INTER_NEAREST)
     except Exception as e:
         return cropped_image
 
+def recognize_box_qty_digits(processed_box_qty_image):
+    """
+    Reads the BOX QTY digits from the preprocessed crop by matching each digit blob,
+    left to right, against the digit templates.
+    Returns None when the templates are missing, any blob (digit or noise-sized sliver) is cut off
+    by an edge of the crop, or a digit does not match confidently.
+    """
+    if DIGIT_TEMPLATES is None or processed_box_qty_image.size == 0:
+        return None
+    mask = cv2.bitwise_not(processed_box_qty_image)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = [cv2.boundingRect(contour) for contour in contours]
+    if not boxes:
+        return None
+    crop_height, crop_width = processed_box_qty_image.shape[:2]
+    # A clipped digit can look like another one, and a clipped sliver would silently drop a digit,
+    # so Tesseract gets the crop instead
+    if any(x == 0 or y == 0 or x + w >= crop_width or y + h >= crop_height for x, y, w, h in boxes):
+        return None
+    min_height = DIGIT_MIN_HEIGHT_RATIO * max(h for _, _, _, h in boxes)
+
+    digits = []
+    for x, y, w, h in sorted(box for box in boxes if box[3] >= min_height):
+        blob = normalize_digit(mask[y:y + h, x:x + w])
+        if blob is None:
+            return None
+        scores = [cv2.matchTemplate(blob, template, cv2.TM_CCOEFF_NORMED)[0][0] for template in DIGIT_TEMPLATES]
+        best = int(np.argmax(scores))
+        if scores[best] < DIGIT_MATCH_THRESHOLD:
+            return None
+        digits.append(str(best))
+    return "".join(digits)
+
 def extract_box_qty_from_text(text):
     """
     Extracts the numeric value for 'Box QTY' using refined regex.
     """
-    numbers = re.findall(r'\b\d+\b', text.strip())
-    return numbers[0] if numbers else "N/A"
+    match = BOX_QTY_NUMBER_PATTERN.search(text)
+    return match.group(0) if match else "N/A"
 
 def extract_qr_and_box_qty(image):
     """
     Extracts QR code data and the numeric value for 'Box QTY' from the image.
+    The grayscale page is computed once and shared by the QR, label and BOX QTY steps.
     """
-    preprocessed_image = preprocess_image(image)
-    qr_data_list = [qr.data.decode('utf-8') for qr in decode(preprocessed_image)]
+    gray = to_grayscale(image)
+    # The QR decoder binarizes internally, so it gets the grayscale page rather than an Otsu copy
+    qr_data_list = decode_qr_codes(gray)
 
-    cropped_box_qty_image = dynamic_crop_box_qty_area(image)
+    cropped_box_qty_image = dynamic_crop_box_qty_area(gray, label_box=locate_box_qty_label(gray))
     box_qty = "N/A"
     if cropped_box_qty_image is not None:
         processed_box_qty_image = preprocess_for_box_qty(cropped_box_qty_image)
-        box_qty_text = pytesseract.image_to_string(
-            processed_box_qty_image, config='--psm 7 -c tessedit_char_whitelist=0123456789'
-        )
-        box_qty = extract_box_qty_from_text(box_qty_text)
+        box_qty = recognize_box_qty_digits(processed_box_qty_image)
+        if box_qty is None:
+            box_qty = extract_box_qty_from_text(ocr_box_qty_digits(processed_box_qty_image))
 
     return qr_data_list, box_qty
 
-def process_page(page):
+def render_pdf_page(page, dpi=PDF_RENDER_DPI, clip=None):
+    """
+    Renders a PyMuPDF page, or only the clip area (in PDF points), straight into a grayscale numpy array.
+    QR decoding and OCR only need grayscale, so no color buffer or channel swap is produced.
+    """
+    if clip is not None:
+        clip = clip & page.rect
+        if clip.is_empty:
+            return np.empty((0, 0), dtype=np.uint8)
+    zoom = dpi / 72
+    pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), colorspace=pymupdf.csGRAY, alpha=False, clip=clip)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+
+def render_box_qty_area(page, label_box):
+    """
+    Re-renders only the area below the 'BOX QTY' label at BOX_QTY_RENDER_DPI.
+    label_box is given in pixels of the PDF_RENDER_DPI page render.
+    """
+    scale = BOX_QTY_RENDER_DPI / PDF_RENDER_DPI
+    left, top, right, bottom = box_qty_crop_rect([int(round(value * scale)) for value in label_box])
+    to_points = 72 / BOX_QTY_RENDER_DPI
+    clip = pymupdf.Rect(left * to_points, top * to_points, right * to_points, bottom * to_points)
+    return render_pdf_page(page, BOX_QTY_RENDER_DPI, clip)
+
+def init_pdf_worker(pdf_path):
+    """
+    Opens the PDF once in each worker process.
+    """
+    global _worker_document
+    _worker_document = pymupdf.open(pdf_path)
+
+def read_or_save_box_qty_crop(cropped_image, crop_path):
     """
-    Processes a single PDF page to extract QR codes and Box QTY.
+    Preprocesses a cropped BOX QTY area and reads it with the digit templates, or tesserocr when available.
+    Otherwise the crop is saved for the batched Tesseract run and None is returned.
+    """
+    processed_box_qty_image = preprocess_for_box_qty(cropped_image)
+    box_qty = recognize_box_qty_digits(processed_box_qty_image)
+    if box_qty is not None:
+        return box_qty
+    if tesserocr is not None:
+        return extract_box_qty_from_text(ocr_box_qty_digits(processed_box_qty_image))
+    if processed_box_qty_image.size == 0:
+        # Tesseract cannot read an empty image; a blank pixel still yields one page of output
+        processed_box_qty_image = np.full((1, 1), 255, dtype=np.uint8)
+    cv2.imwrite(crop_path, processed_box_qty_image)
+    return None
+
+def process_page(args):
+    """
+    Decodes the QR codes of a single PDF page and reads its BOX QTY, or saves the crop for the
+    batched Tesseract run. When the label cannot be found by template matching, it is located on a
+    BOX_QTY_RENDER_DPI render with tesserocr, or that render is saved for the batched Tesseract run.
+    Without a label template nothing can anchor a clip render, so the page is rendered once at
+    BOX_QTY_RENDER_DPI and that render is used for the QR codes too.
+    Returns (qr_data_list, needs_locate, box_qty) with box_qty None until it has been read.
+    """
+    page_index, page_path, crop_path = args
+    dpi = PDF_RENDER_DPI if BOX_QTY_TEMPLATE is not None else BOX_QTY_RENDER_DPI
+    with _render_lock:
+        page = _worker_document[page_index]
+        gray = render_pdf_page(page, dpi)
+    qr_data_list = decode_qr_codes(gray)
+
+    label_box = locate_box_qty_label(gray)
+    page_image = gray
+    with _render_lock:
+        if label_box is not None:
+            cropped_image = render_box_qty_area(page, label_box)
+        elif dpi != BOX_QTY_RENDER_DPI:
+            page_image = render_pdf_page(page, BOX_QTY_RENDER_DPI)
+        # Release the page while the lock is still held
+        del page
+
+    if label_box is None:
+        if tesserocr is None:
+            cv2.imwrite(page_path, page_image)
+            return qr_data_list, True, None
+        cropped_image = dynamic_crop_box_qty_area(page_image)
+    return qr_data_list, False, read_or_save_box_qty_crop(cropped_image, crop_path)
+
+def write_image_list(list_path, image_paths):
+    """
+    Writes a Tesseract image list file so all images are recognized in a single invocation.
+    """
+    with open(list_path, 'w', encoding='utf-8') as list_file:
+        list_file.write("\n".join(image_paths) + "\n")
+    return list_path
+
+def split_ocr_data_by_page(ocr_data, total_pages):
+    """
+    Splits image_to_data output of a multi-image Tesseract run into one dict per page.
+    """
+    keys = ('text', 'left', 'top', 'width', 'height')
+    pages_data = [{key: [] for key in keys} for _ in range(total_pages)]
+    for i, page_num in enumerate(ocr_data['page_num']):
+        for key in keys:
+            pages_data[int(page_num) - 1][key].append(ocr_data[key][i])
+    return pages_data
+
+def split_tesseract_runs(pages):
+    """
+    Splits a list of page indexes into at most TESSERACT_JOBS runs of near-equal size.
+    """
+    run_size = -(-len(pages) // min(TESSERACT_JOBS, len(pages)))
+    return [pages[i:i + run_size] for i in range(0, len(pages), run_size)]
+
+def ocr_page_list(list_path):
+    """
+    Runs Tesseract once over every page in an image list file to locate the words.
+    """
+    return pytesseract.image_to_data(list_path, config=BOX_QTY_LOCATE_CONFIG, output_type=pytesseract.Output.DICT)
+
+def ocr_crop_list(list_path):
+    """
+    Runs Tesseract once over every BOX QTY crop in an image list file.
+    Tesseract ends the text of every image in the list with a form feed.
+    """
+    return pytesseract.image_to_string(list_path, config=BOX_QTY_DIGITS_CONFIG).split('\f')
+
+def read_box_qty_batch(tmpdir, batch_pages, unlocated_pages, box_qtys, page_paths, crop_paths):
+    """
+    Reads the BOX QTY of a batch of pages with Tesseract runs over image list files: first to locate
+    the labels that template matching missed, then for the digits the templates could not read.
+    The pages are split over TESSERACT_JOBS list files whose Tesseract runs are started concurrently.
+    box_qtys maps page index to the BOX QTY already read; it is completed for every page in batch_pages.
+    """
+    batch_name = f"{batch_pages[0]:04d}"
+    # The Tesseract processes do the work, so threads are enough to wait on them
+    with ThreadPoolExecutor(max_workers=TESSERACT_JOBS) as tesseract_runs:
+        if unlocated_pages:
+            page_runs = split_tesseract_runs(unlocated_pages)
+            list_paths = [
+                write_image_list(os.path.join(tmpdir, f"pages_{batch_name}_{i}.txt"), [page_paths[idx] for idx in run])
+                for i, run in enumerate(page_runs)
+            ]
+            for run, ocr_data in zip(page_runs, tesseract_runs.map(ocr_page_list, list_paths)):
+                for idx, page_ocr_data in zip(run, split_ocr_data_by_page(ocr_data, len(run))):
+                    image = cv2.imread(page_paths[idx], cv2.IMREAD_GRAYSCALE)
+                    box_qtys[idx] = read_or_save_box_qty_crop(dynamic_crop_box_qty_area(image, page_ocr_data), crop_paths[idx])
+
+        unread_pages = [idx for idx in batch_pages if box_qtys[idx] is None]
+        if unread_pages:
+            crop_runs = split_tesseract_runs(unread_pages)
+            list_paths = [
+                write_image_list(os.path.join(tmpdir, f"box_qty_{batch_name}_{i}.txt"), [crop_paths[idx] for idx in run])
+                for i, run in enumerate(crop_runs)
+            ]
+            for run, box_qty_texts in zip(crop_runs, tesseract_runs.map(ocr_crop_list, list_paths)):
+                for i, idx in enumerate(run):
+                    box_qtys[idx] = extract_box_qty_from_text(box_qty_texts[i]) if i < len(box_qty_texts) else "N/A"
+
+def write_qr_rows(writer, qr_data_list, box_qty):
+    """
+    Writes one CSV row per QR code of a page and returns the number of rows written.
     """
-    image = cv2.cvtColor(np.array(page), cv2.COLOR_RGB2BGR)
-    qr_data_list, box_qty = extract_qr_and_box_qty(image)
-    result_data = []
     for qr_data in qr_data_list:
-        qr_columns = qr_data.replace(":", "|").split('|')
+        qr_columns = qr_data.translate(QR_SEPARATOR_TABLE).split('|')
         qr_columns.extend([box_qty, "P1"])
-        result_data.append(qr_columns)
-    return result_data
+        writer.writerow(qr_columns)
+    return len(qr_data_list)
 
-def extract_qr_and_box_qty_from_pdf(pdf_path, progress_callback=None):
+def extract_qr_and_box_qty_from_pdf(pdf_path, csv_file, progress_callback=None):
+    """
+    Extracts QR codes and Box QTY from every PDF page and writes the rows to csv_file.
+    With tesserocr every page is written as soon as it is done; otherwise the rows are written
+    after each batch of OCR_BATCH_PAGES pages has been through the batched Tesseract run.
+    Returns the number of rows written.
+    """
+    global _worker_document
+    writer = csv.writer(csv_file)
+    row_count = 0
     try:
-        pages = convert_from_path(pdf_path, dpi=300)
-        all_qr_data = []
-        total_pages = len(pages)
-        for idx, page in enumerate(pages):
-            if progress_callback:
-                progress_callback(idx + 1, total_pages)
-            all_qr_data.extend(process_page(page))
-        return all_qr_data
+        with pymupdf.open(pdf_path) as document:
+            total_pages = document.page_count
+        if not total_pages:
+            return row_count
+
+        if tesserocr is not None:
+            # Worker threads share one open document; each creates its tesserocr APIs on first use
+            _worker_document = pymupdf.open(pdf_path)
+            # Every page is read in full by its worker, so nothing is saved and there is no batch step
+            page_args = [(idx, None, None) for idx in range(total_pages)]
+            with ThreadPoolExecutor(max_workers=min(PDF_THREADS, total_pages)) as executor:
+                # map keeps page order for the CSV while pages are processed in parallel
+                for idx, (qr_data_list, _, box_qty) in enumerate(executor.map(process_page, page_args)):
+                    if progress_callback:
+                        progress_callback(idx + 1, total_pages)
+                    row_count += write_qr_rows(writer, qr_data_list, box_qty)
+                    csv_file.flush()
+            return row_count
+
+        executor = ProcessPoolExecutor(max_workers=min(PDF_WORKERS, total_pages),
+                                       initializer=init_pdf_worker, initargs=(pdf_path,))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            page_paths = [os.path.join(tmpdir, f"page_{idx:04d}.png") for idx in range(total_pages)]
+            crop_paths = [os.path.join(tmpdir, f"box_qty_{idx:04d}.png") for idx in range(total_pages)]
+            with executor:
+                for batch_start in range(0, total_pages, OCR_BATCH_PAGES):
+                    batch_pages = range(batch_start, min(batch_start + OCR_BATCH_PAGES, total_pages))
+                    qr_pages = []
+                    unlocated_pages = []
+                    box_qtys = {}
+                    # map keeps page order for the CSV while pages are processed in parallel
+                    page_args = [(idx, page_paths[idx], crop_paths[idx]) for idx in batch_pages]
+                    for idx, (qr_data_list, needs_locate, box_qty) in zip(batch_pages, executor.map(process_page, page_args)):
+                        if progress_callback:
+                            progress_callback(idx + 1, total_pages)
+                        qr_pages.append(qr_data_list)
+                        box_qtys[idx] = box_qty
+                        if needs_locate:
+                            unlocated_pages.append(idx)
+
+                    read_box_qty_batch(tmpdir, batch_pages, unlocated_pages, box_qtys, page_paths, crop_paths)
+                    for qr_data_list, idx in zip(qr_pages, batch_pages):
+                        row_count += write_qr_rows(writer, qr_data_list, box_qtys[idx])
+                    csv_file.flush()
+        return row_count
     except Exception as e:
-        return [[f"Error: {e}"]]
+        writer.writerow([f"Error: {e}"])
+        return row_count + 1
+    finally:
+        if tesserocr is not None and _worker_document is not None:
+            _worker_document.close()
+            _worker_document = None
 
 def extract_qr_and_box_qty_from_image(image_path):
     try:
@@ -156,7 +594,7 @@ def extract_qr_and_box_qty_from_image(image_path):
         qr_data_list, box_qty = extract_qr_and_box_qty(image)
         result_data = []
         for qr_data in qr_data_list:
-            qr_columns = qr_data.replace(":", "|").split('|')
+            qr_columns = qr_data.translate(QR_SEPARATOR_TABLE).split('|')
             qr_columns.extend([box_qty, "P1"])
             result_data.append(qr_columns)
         return result_data
@@ -164,13 +602,54 @@ def extract_qr_and_box_qty_from_image(image_path):
         return [[f"Error: {e}"]]
 
 def save_to_csv(output_path, data):
+    with open(output_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerows(data)
+
+def extract_to_csv(file_path, output_path):
+    """
+    Extracts the input file into the output CSV on the extraction thread.
+    Returns the (kind, title, message) of the message box to show when it is done.
+    """
+    if file_path.lower().endswith((".png", ".jpg", ".jpeg", ".tiff", ".bmp")):
+        result = extract_qr_and_box_qty_from_image(file_path)
+        if not (result and any(len(row) > 0 for row in result)):
+            return "warning", "No Data Found", "No QR code or BOX QTY data could be extracted."
+        try:
+            save_to_csv(output_path, result)
+        except Exception as e:
+            return "error", "Error", f"Error saving file: {e}"
+        return "info", "Success", f"Data saved to {output_path}"
+
+    # PDF rows are streamed into a temporary file next to the output while the pages are processed;
+    # it only replaces the output once rows were written, so an existing CSV survives a PDF without data
+    temp_path = None
     try:
-        with open(output_path, 'w', newline='', encoding='utf-8') as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerows(data)
-        messagebox.showinfo("Success", f"Data saved to {output_path}")
+        with tempfile.NamedTemporaryFile('w', newline='', encoding='utf-8', suffix=".csv", delete=False,
+                                         dir=os.path.dirname(os.path.abspath(output_path))) as csv_file:
+            temp_path = csv_file.name
+            row_count = extract_qr_and_box_qty_from_pdf(file_path, csv_file, report_progress)
+        if row_count:
+            os.replace(temp_path, output_path)
     except Exception as e:
-        messagebox.showerror("Error", f"Error saving file: {e}")
+        return "error", "Error", f"Error saving file: {e}"
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+    if row_count:
+        return "info", "Success", f"Data saved to {output_path}"
+    return "warning", "No Data Found", "No QR code or BOX QTY data could be extracted."
+
+def extraction_thread(file_path, output_path):
+    try:
+        result = extract_to_csv(file_path, output_path)
+    except Exception as e:
+        result = "error", "Error", f"Error: {e}"
+    gui_queue.put(("done",) + result)
+
+def report_progress(progress, total):
+    # Called from the extraction thread; the GUI applies it on its next poll
+    gui_queue.put(("progress", progress, total))
 
 def browse_file():
     file_path = filedialog.askopenfilename(filetypes=[("PDF and Images", "*.pdf;*.png;*.jpg;*.jpeg;*.tiff;*.bmp")])
@@ -188,7 +667,31 @@ def update_progress_bar(progress, total):
     percent = int((progress / total) * 100)
     progress_var.set(percent)
     progress_label.config(text=f"Progress: {percent}%")
-    progress_bar.update()
+
+def poll_extraction():
+    # Only the latest progress message matters, so everything queued since the last poll is coalesced
+    latest_progress = None
+    result = None
+    while True:
+        try:
+            message = gui_queue.get_nowait()
+        except queue.Empty:
+            break
+        if message[0] == "progress":
+            latest_progress = message[1:]
+        else:
+            result = message[1:]
+
+    if latest_progress:
+        update_progress_bar(*latest_progress)
+    if result is None:
+        root.after(GUI_POLL_MS, poll_extraction)
+        return
+
+    run_button.config(state=tk.NORMAL)
+    kind, title, text = result
+    show_message = {"info": messagebox.showinfo, "warning": messagebox.showwarning, "error": messagebox.showerror}[kind]
+    show_message(title, text)
 
 def run_extraction():
     file_path = input_entry.get()
@@ -197,43 +700,45 @@ def run_extraction():
         messagebox.showerror("Error", "Please select input file and output location.")
         return
 
-    if file_path.lower().endswith((".png", ".jpg", ".jpeg", ".tiff", ".bmp")):
-        result = extract_qr_and_box_qty_from_image(file_path)
-    elif file_path.lower().endswith(".pdf"):
-        result = extract_qr_and_box_qty_from_pdf(file_path, update_progress_bar)
-    else:
+    if not file_path.lower().endswith((".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".pdf")):
         messagebox.showerror("Error", "Unsupported file format.")
         return
 
-    if result and any(len(row) > 0 for row in result):
-        save_to_csv(output_path, result)
-    else:
-        messagebox.showwarning("No Data Found", "No QR code or BOX QTY data could be extracted.")
-
-# GUI Setup
-root = tk.Tk()
-root.title("QR Code and Box QTY Reader")
-
-# Input File Selection
-tk.Label(root, text="Select Input File:").grid(row=0, column=0, padx=10, pady=10)
-input_entry = tk.Entry(root, width=50)
-input_entry.grid(row=0, column=1, padx=10, pady=10)
-tk.Button(root, text="Browse", command=browse_file).grid(row=0, column=2, padx=10, pady=10)
-
-# Output File Selection
-tk.Label(root, text="Select Output File:").grid(row=1, column=0, padx=10, pady=10)
-output_entry = tk.Entry(root, width=50)
-output_entry.grid(row=1, column=1, padx=10, pady=10)
-tk.Button(root, text="Browse", command=browse_output).grid(row=1, column=2, padx=10, pady=10)
-
-# Progress Bar
-progress_var = tk.IntVar()
-progress_bar = ttk.Progressbar(root, variable=progress_var, maximum=100)
-progress_bar.grid(row=2, column=0, columnspan=3, padx=10, pady=10, sticky="we")
-progress_label = tk.Label(root, text="Progress: 0%")
-progress_label.grid(row=3, column=0, columnspan=3, padx=10, pady=5)
-
-# Run Button
-tk.Button(root, text="Run", command=run_extraction, bg="green", fg="white").grid(row=4, column=1, padx=10, pady=20)
-
-root.mainloop()
+    # Extract on a separate thread so the window stays responsive on long PDFs
+    run_button.config(state=tk.DISABLED)
+    update_progress_bar(0, 1)
+    threading.Thread(target=extraction_thread, args=(file_path, output_path), daemon=True).start()
+    root.after(GUI_POLL_MS, poll_extraction)
+
+if __name__ == "__main__":
+    # Required for worker processes when frozen into a Windows executable
+    multiprocessing.freeze_support()
+
+    # GUI Setup
+    root = tk.Tk()
+    root.title("QR Code and Box QTY Reader")
+
+    # Input File Selection
+    tk.Label(root, text="Select Input File:").grid(row=0, column=0, padx=10, pady=10)
+    input_entry = tk.Entry(root, width=50)
+    input_entry.grid(row=0, column=1, padx=10, pady=10)
+    tk.Button(root, text="Browse", command=browse_file).grid(row=0, column=2, padx=10, pady=10)
+
+    # Output File Selection
+    tk.Label(root, text="Select Output File:").grid(row=1, column=0, padx=10, pady=10)
+    output_entry = tk.Entry(root, width=50)
+    output_entry.grid(row=1, column=1, padx=10, pady=10)
+    tk.Button(root, text="Browse", command=browse_output).grid(row=1, column=2, padx=10, pady=10)
+
+    # Progress Bar
+    progress_var = tk.IntVar()
+    progress_bar = ttk.Progressbar(root, variable=progress_var, maximum=100)
+    progress_bar.grid(row=2, column=0, columnspan=3, padx=10, pady=10, sticky="we")
+    progress_label = tk.Label(root, text="Progress: 0%")
+    progress_label.grid(row=3, column=0, columnspan=3, padx=10, pady=5)
+
+    # Run Button
+    run_button = tk.Button(root, text="Run", command=run_extraction, bg="green", fg="white")
+    run_button.grid(row=4, column=1, padx=10, pady=20)
+
+    root.mainloop()